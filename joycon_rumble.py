@@ -1,4 +1,7 @@
 import math
+import array
+import functools
+import struct
 from pyjoycon import JoyCon
 import sys # For printing errors
 
@@ -9,21 +12,22 @@ def clamp(value, min_val, max_val):
     if (value > max_val): return max_val;
     return value;
 
+# Official "rumble off" packet, also used as the fallback for malformed data
+_OFF_PKT = b'\x00\x01\x40\x40\x00\x01\x40\x40'
+
 class RumbleJoyCon(JoyCon):
+    # Fixed packets, known to be 8 bytes, so they skip _send_rumble's length guard
+    _SIMPLE_PKT = b'\x98\x1e\xc6\x47\x98\x1e\xc6\x47'
+    _STOP_PKT = _OFF_PKT
+
     def __init__(self, *args, **kwargs):
         JoyCon.__init__(self, *args, **kwargs)
 
     def _send_rumble(self, data=b'\x00\x00\x00\x00\x00\x00\x00\x00'):
-        try:
-            # Basic check for data length
-            if len(data) != 8:
-                 print(f"[RumbleJoyCon Error] Invalid rumble data length: {len(data)}. Using default off.", file=sys.stderr)
-                 data = b'\x00\x01\x40\x40\x00\x01\x40\x40' # Default off packet
-            self._RUMBLE_DATA = data
-            self._write_output_report(b'\x10', b'', b'')
-        except Exception as e:
-            print(f"[RumbleJoyCon Error] Failed to send rumble: {e}", file=sys.stderr)
-            # Avoid crashing the main loop if rumble sending fails
+        # Hot path: no per-packet try/except. Callers wrap sends in their own
+        # error handling so a failed write doesn't crash the main loop.
+        self._RUMBLE_DATA = data if len(data) == 8 else _OFF_PKT # Fall back to off on malformed data
+        self._write_output_report(b'\x10', b'', b'')
 
     def enable_vibration(self, enable=True):
         """Sends enable or disable command for vibration."""
@@ -34,15 +38,161 @@ class RumbleJoyCon(JoyCon):
 
     def rumble_simple(self):
         """Rumble for approximately 1.5 seconds. Repeat sending to keep rumbling."""
-        self._send_rumble(b'\x98\x1e\xc6\x47\x98\x1e\xc6\x47')
+        self._RUMBLE_DATA = self._SIMPLE_PKT
+        self._write_output_report(b'\x10', b'', b'')
 
     def rumble_stop(self):
         """Instantly stops the rumble"""
-        self._send_rumble(b'\x00\x01\x40\x40\x00\x01\x40\x40') # Use official off packet
+        self._RUMBLE_DATA = self._STOP_PKT # Use official off packet
+        self._write_output_report(b'\x10', b'', b'')
 
 
 # derived from https://github.com/Looking-Glass/JoyconLib/blob/master/Packages/com.lookingglass.joyconlib/JoyconLib_scripts/Joycon.cs
+# Frequency encoding offsets with the *0.1 scaling folded in:
+# 32*log2(f*0.1) - k == 32*log2(f) + (-32*log2(10) - k)
+_HF_BIAS = -32.0 * math.log2(10) - 0x60
+_LF_BIAS = -32.0 * math.log2(10) - 0x40
+
+def _encode_hf(high_freq):
+    """Encodes a high frequency (Hz), clamped to the supported range."""
+    h_f = clamp(high_freq, 81.75177, 1252.572266)
+    return round(32.0 * math.log2(h_f) + _HF_BIAS) * 4 # round() on a float already returns an int
+
+def _encode_lf(low_freq):
+    """Encodes a low frequency (Hz), clamped to the supported range."""
+    l_f = clamp(low_freq, 40.875885, 626.286133)
+    return round(32.0 * math.log2(l_f) + _LF_BIAS)
+
+def _encode_hf_amp(amp):
+    """Encodes the high frequency amplitude component for amp in (0.0, 1.0]."""
+    # The log term is shared by all three branches, so evaluate it once
+    amp_log = (math.log2(amp * 1000) * 32) - 0x60
+    if amp < 0.117: hf_amp = int(amp_log / (5 - amp * amp) - 1);
+    elif amp < 0.23: hf_amp = int(amp_log - 0x5c)
+    else: hf_amp = int((amp_log * 2) - 0xf6);
+    # Ensure hf_amp is non-negative
+    return max(0, hf_amp)
+
+def _encode_lf_amp(hf_amp):
+    """Derives the encoded low frequency amplitude component from hf_amp."""
+    lf_amp_intermediate = int(hf_amp * .5); # hf_amp is already an int, no rounding needed
+    parity = lf_amp_intermediate % 2;
+    if (parity > 0):
+        lf_amp_intermediate -= 1
+
+    lf_amp_intermediate = lf_amp_intermediate >> 1;
+    lf_amp_intermediate += 0x40;
+    if (parity > 0):
+        # Ensure lf_amp doesn't exceed 16 bits even with parity (shouldn't happen with calc)
+        lf_amp_intermediate |= 0x8000;
+    return lf_amp_intermediate
+
+# --- Frequency lookup tables ---
+# GetData quantizes frequencies to 0.1 Hz, so the encoded hf/lf values form a
+# small closed set. Tables are indexed by frequency in tenths of a Hz (offset by
+# the table minimum); the end indices hold the clamped boundary frequencies.
+_HF_IDX_MIN = math.floor(81.75177 * 10); _HF_IDX_MAX = math.ceil(1252.572266 * 10)
+_LF_IDX_MIN = math.floor(40.875885 * 10); _LF_IDX_MAX = math.ceil(626.286133 * 10)
+_HF_TABLE = array.array('i', (_encode_hf(i / 10) for i in range(_HF_IDX_MIN, _HF_IDX_MAX + 1)))
+_LF_TABLE = array.array('i', (_encode_lf(i / 10) for i in range(_LF_IDX_MIN, _LF_IDX_MAX + 1)))
+
+# --- Amplitude lookup table ---
+# Amplitude is quantized to 0.001, so the amplitude-only half of the encoding
+# is tabulated per thousandth as (hf_amp, encoded_lf_amp) pairs. Index 0 is
+# never read: zero amplitude short-circuits to the off packet.
+_AMP_TABLE = tuple((hf_amp, _encode_lf_amp(hf_amp))
+                   for hf_amp in (_encode_hf_amp(i / 1000) if i else 0 for i in range(1001)))
+
+# Emits an 8-byte packet from two little-endian 32-bit words
+_pack_packet = struct.Struct('<II').pack
+
+def _assemble_packet(hf, lf, hf_amp, encoded_lf_amp):
+    """Combines the encoded frequency and amplitude components into the 8-byte packet."""
+    # --- Assemble the bytes ---
+    # Bytes 0 and 3 are masked, so only the two bytes that have an
+    # amplitude component added can leave the [0, 255] range.
+    byte0 = hf & 0xff
+    byte1 = ((hf >> 8) & 0xff) + hf_amp # High byte of hf plus hf_amp
+    byte2 = lf + ((encoded_lf_amp >> 8) & 0xff) # lf plus high byte of lf_amp
+    byte3 = encoded_lf_amp & 0xff
+
+    # --- FIX: Saturate the combined results to the valid byte range [0, 255] ---
+    # Both operands of each sum are non-negative, so only the upper bound can be hit.
+    if byte1 > 255: byte1 = 255
+    if byte2 > 255: byte2 = 255
+
+    # Pack the four bytes into one little-endian 32-bit word and write it twice
+    # (bytes 4-7 mirror bytes 0-3) in a single C-level struct pack.
+    word = byte0 | (byte1 << 8) | (byte2 << 16) | (byte3 << 24)
+    return _pack_packet(word, word)
+
+def _encode_table(low_freq, high_freq, amp):
+    """'table' backend: looks every component up in the precomputed tables."""
+    # Look up encoded high/low frequency components (index clamps the range)
+    hf_idx = round(high_freq * 10)
+    hf_idx = _HF_IDX_MAX if hf_idx > _HF_IDX_MAX else _HF_IDX_MIN if hf_idx < _HF_IDX_MIN else hf_idx
+    hf = _HF_TABLE[hf_idx - _HF_IDX_MIN]
+    lf_idx = round(low_freq * 10)
+    lf_idx = _LF_IDX_MAX if lf_idx > _LF_IDX_MAX else _LF_IDX_MIN if lf_idx < _LF_IDX_MIN else lf_idx
+    lf = _LF_TABLE[lf_idx - _LF_IDX_MIN]
+
+    # Look up both amplitude components at once (amplitude is quantized to 0.001)
+    hf_amp, encoded_lf_amp = _AMP_TABLE[round(amp * 1000)]
+    return _assemble_packet(hf, lf, hf_amp, encoded_lf_amp)
+
+def _encode_pure(low_freq, high_freq, amp):
+    """'pure' backend: computes every component directly, without the tables."""
+    hf_amp = _encode_hf_amp(amp)
+    return _assemble_packet(_encode_hf(high_freq), _encode_lf(low_freq), hf_amp, _encode_lf_amp(hf_amp))
+
+# Available encoding backends and the active one (see RumbleData.set_mode)
+_ENCODE_BACKENDS = {"table": _encode_table, "pure": _encode_pure}
+_encode = _encode_table
+
+@functools.lru_cache(maxsize=4096)
+def _encode_rumble(low_freq, high_freq, amplitude):
+    """
+    Calculates and returns the 8-byte rumble data packet for the given
+    (already quantized) frequencies and amplitude, using the active backend.
+    Pure function of its arguments, so results are memoized: holding the same
+    rumble for many frames costs a dict lookup instead of the full encoding.
+    No try/except here: errors propagate to the caller, which already
+    handles failures around the send.
+    """
+    # Ensure amplitude is clamped 0.0-1.0 before the check (inlined clamp)
+    amp = 1.0 if amplitude > 1.0 else 0.0 if amplitude < 0.0 else amplitude
+    if (amp == 0.0):
+        return _OFF_PKT # Use default off packet
+    return _encode(low_freq, high_freq, amp)
+
+def _encode_quantized(l_f, h_f, amp):
+    """Quantizes one (low_freq, high_freq, amp) frame and returns its encoded packet."""
+    # NaN slips past the clamps (every comparison is False) and inf can't be
+    # rounded to a table index, so non-finite input falls back to the off
+    # packet, as the original try/except around the encoding did.
+    if not (math.isfinite(l_f) and math.isfinite(h_f) and math.isfinite(amp)):
+        return _OFF_PKT
+    # Quantize to 0.1 Hz / 0.001 amplitude so the encoder cache stays bounded
+    return _encode_rumble(round(l_f, 1), round(h_f, 1), round(amp, 3))
+
+
 class RumbleData:
+    # Fixed attribute set: no per-instance __dict__, faster attribute access
+    __slots__ = ('h_f', 'amp', 'l_f', 'timed_rumble', 't')
+
+    @staticmethod
+    def set_mode(mode):
+        """
+        Selects the packet encoding backend:
+        'table' (default) uses the lookup tables built at import,
+        'pure' computes each packet directly from the frequency/amplitude math.
+        """
+        global _encode
+        if mode not in _ENCODE_BACKENDS:
+            raise ValueError(f"Unknown rumble encoding mode {mode!r}; expected one of {sorted(_ENCODE_BACKENDS)}")
+        _encode = _ENCODE_BACKENDS[mode]
+        _encode_rumble.cache_clear() # Drop packets memoized under the previous backend
+
     # __init__ using set_vals for consistency
     def __init__(self, low_freq, high_freq, amplitude, time=0):
         self.set_vals(low_freq, high_freq, amplitude, time)
@@ -60,84 +210,31 @@ class RumbleData:
 
     def GetData(self):
         """Calculates and returns the 8-byte rumble data packet."""
-        rumble_data = [0] * 8 # Initialize with 0s (safer than None)
-        # Default "off" packet structure
-        default_off = [0, 1, 64, 64, 0, 1, 64, 64]
-
-        try: # Wrap calculations in try-except for robustness
-            # Ensure amplitude is clamped 0.0-1.0 before the check
-            clamped_amp = clamp(self.amp, 0.0, 1.0)
-
-            if (clamped_amp == 0.0):
-                rumble_data = default_off # Use default off packet
-            else:
-                # Clamp frequencies and amplitude for calculations
-                l_f = clamp(self.l_f, 40.875885, 626.286133);
-                amp = clamped_amp # Use already clamped amplitude
-                h_f = clamp(self.h_f, 81.75177, 1252.572266);
-
-                # Calculate encoded high frequency components
-                hf = int((round(32.0 * math.log(h_f * 0.1, 2)) - 0x60) * 4);
-                # Calculate encoded low frequency components
-                lf = int(round(32.0 * math.log(l_f * 0.1, 2)) - 0x40);
-
-                # Calculate high frequency amplitude component
-                hf_amp = 0 # Default
-                if amp < 0.117: hf_amp = int(((math.log(amp * 1000, 2) * 32) - 0x60) / (5 - pow(amp, 2)) - 1);
-                elif amp < 0.23: hf_amp = int(((math.log(amp * 1000, 2) * 32) - 0x60) - 0x5c)
-                else: hf_amp = int((((math.log(amp * 1000, 2) * 32) - 0x60) * 2) - 0xf6);
-                # Ensure hf_amp is non-negative
-                hf_amp = max(0, hf_amp)
-
-                # Calculate low frequency amplitude component (encoded)
-                lf_amp_intermediate = int(round(hf_amp) * .5);
-                parity = int(lf_amp_intermediate % 2);
-                if (parity > 0):
-                    lf_amp_intermediate -= 1
-
-                # Ensure non-negative before shift
-                lf_amp_intermediate = max(0, lf_amp_intermediate)
-                lf_amp_intermediate = int(lf_amp_intermediate >> 1);
-                lf_amp_intermediate += 0x40;
-                if (parity > 0):
-                    # Ensure lf_amp doesn't exceed 16 bits even with parity (shouldn't happen with calc)
-                    lf_amp_intermediate |= 0x8000;
-
-                encoded_lf_amp = lf_amp_intermediate
-
-                # --- Assemble the bytes ---
-                # Calculate base byte values (before adding amplitudes)
-                byte0 = int(hf & 0xff)
-                byte1_base = int((hf >> 8) & 0xff) # Extract potential high byte of hf
-                byte2_base = lf # lf calculation result should fit in a byte
-                byte3 = int(encoded_lf_amp & 0xff) # Extract low byte of encoded lf_amp
-
-                # Add amplitude components to base bytes
-                byte1_final_raw = byte1_base + hf_amp
-                byte2_final_raw = byte2_base + int((encoded_lf_amp >> 8) & 0xff) # Add high byte of lf_amp
-
-                # --- FIX: Clamp the combined results to the valid byte range [0, 255] ---
-                rumble_data[0] = clamp(byte0, 0, 255)
-                rumble_data[1] = clamp(byte1_final_raw, 0, 255) # Clamp result after adding hf_amp
-                rumble_data[2] = clamp(byte2_final_raw, 0, 255) # Clamp result after adding lf_amp high byte
-                rumble_data[3] = clamp(byte3, 0, 255)
-
-            # Copy bytes 0-3 to 4-7 for the full packet
-            for i in range(4):
-                rumble_data[4 + i] = rumble_data[i];
-
-            # Final check (optional, but good for sanity)
-            for i, val in enumerate(rumble_data):
-                if not (0 <= val <= 255):
-                    print(f"[RumbleData Critical Error] Post-clamp value out of range: rumble_data[{i}] = {val}. Falling back to 'off'.", file=sys.stderr)
-                    rumble_data = default_off
-                    break
-
-            return bytes(rumble_data)
-
-        except Exception as e:
-            print(f"[RumbleData Error] Exception during GetData calculation: {e}. Falling back to 'off'.", file=sys.stderr)
-            import traceback
-            traceback.print_exc()
-            # Return safe default rumble (off) packet if any error occurs
-            return bytes(default_off)
+        return _encode_quantized(self.l_f, self.h_f, self.amp)
+
+    @classmethod
+    def encode_batch(cls, low_freqs, high_freqs, amps):
+        """
+        Encodes a whole timeline of rumble frames at once.
+        Returns a list of 8-byte packets, one per (low_freq, high_freq, amp) triple,
+        without constructing a RumbleData object per frame.
+        """
+        return [_encode_quantized(l_f, h_f, amp)
+                for l_f, h_f, amp in zip(low_freqs, high_freqs, amps)]
+
+
+def compile_intensity_encoder(low_freq, high_freq):
+    """
+    Specializes rumble encoding for a fixed pair of frequencies.
+    Every quantized intensity (0.001 steps) is encoded once up front, so the
+    returned function maps an intensity in [0.0, 1.0] to its 8-byte packet
+    with a single table index.
+    """
+    l_f = round(low_freq, 1); h_f = round(high_freq, 1)
+    # Bypass the LRU cache: these packets live in the table below instead
+    packets = tuple(_encode_rumble.__wrapped__(l_f, h_f, i / 1000) for i in range(1001))
+
+    def encode(intensity):
+        i = round(intensity * 1000)
+        return packets[1000 if i > 1000 else 0 if i < 0 else i] # Out-of-range intensities clamp
+    return encode
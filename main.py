@@ -1,14 +1,23 @@
 from pyjoycon import get_R_id
-from joycon_rumble import RumbleJoyCon, RumbleData, clamp
+from joycon_rumble import RumbleJoyCon, RumbleData, compile_intensity_encoder
 import math
+import os
+import struct
 import sys
 import time
 import atexit
-from typing import Tuple, Dict, Optional, TypedDict, Callable
-from collections import deque # Used for efficient history tracking (gyro readings)
+import signal # Used to route SIGTERM through the normal exit path
+import ctypes # Used to raise the Windows timer resolution (winmm)
+import threading # Used for the status line writer thread
+import traceback # Full tracebacks for unexpected errors
+from typing import Tuple, Dict, Optional, NamedTuple, Callable
+from array import array # Used for the preallocated gyro history ring buffer
+from bisect import bisect_left # Used for threshold lookup in classification
 
 # Global variable to hold the Joy-Con object
 joycon_right: Optional[RumbleJoyCon] = None # Type hint for clarity
+# Rumble writer of the current/last simulation run, so cleanup can tell if its thread still owns the Joy-Con
+rumble_writer_right: Optional["RumbleWriter"] = None
 # TODO: Left Joy-Con support (if needed) - requires separate initialization and button mapping
 
 # --- Constants for Motion-Based Rumble and Simulation ---
@@ -16,6 +25,9 @@ joycon_right: Optional[RumbleJoyCon] = None # Type hint for clarity
 # -- Gyroscope Settings --
 GYRO_RUMBLE_THRESHOLD = 6000  # Minimum gyro magnitude (rotational speed) required to start rumbling.
 MAX_MOTION_GYRO_MAGNITUDE = 25000 # Gyro magnitude that corresponds to the maximum rumble intensity (1.0) and the highest typhoon category.
+_ACTIVE_RANGE_SIZE = MAX_MOTION_GYRO_MAGNITUDE - GYRO_RUMBLE_THRESHOLD # Gyro range over which rumble intensity scales from 0 to 1.
+assert _ACTIVE_RANGE_SIZE > 0, "MAX_MOTION_GYRO_MAGNITUDE must be greater than GYRO_RUMBLE_THRESHOLD"
+_INV_ACTIVE_RANGE = 1.0 / _ACTIVE_RANGE_SIZE # Reciprocal, so scaling is a multiply instead of a divide.
 
 # -- Linger Settings (Rumble effect fade-out) --
 MAX_LINGER_DURATION = 1.5 # Seconds. The maximum duration the rumble effect will linger after a peak intensity burst (scales with intensity).
@@ -23,6 +35,11 @@ MAX_LINGER_DURATION = 1.5 # Seconds. The maximum duration the rumble effect will
 # -- Rumble Feel Settings (Main Simulation Loop) --
 RUMBLE_LOW_FREQ = 300  # Hz. Low frequency component for the main rumble effect.
 RUMBLE_HIGH_FREQ = 800 # Hz. High frequency component for the main rumble effect.
+# Intensity -> packet encoder specialized for the fixed main rumble frequencies (built once at import).
+_encode_main_rumble = compile_intensity_encoder(RUMBLE_LOW_FREQ, RUMBLE_HIGH_FREQ)
+RUMBLE_RESEND_EPSILON = 0.01 # Intensity changes smaller than this don't trigger a new rumble command (transitions to/from zero always do).
+RUMBLE_KEEPALIVE_S = 0.25 # Resend the current rumble at least this often (seconds) even if unchanged, so the Joy-Con doesn't drop it.
+_RUMBLE_KEEPALIVE_NS = int(RUMBLE_KEEPALIVE_S * 1e9)
 
 # -- Countdown Rumble Settings --
 COUNTDOWN_BASE_FREQ_HZ = 90         # Starting high frequency for the countdown rumble pulse ("3").
@@ -31,15 +48,59 @@ COUNTDOWN_BASE_INTENSITY = 0.3      # Starting rumble intensity for the countdow
 COUNTDOWN_INTENSITY_STEP = 0.1      # Amount to increase intensity for each countdown step.
 COUNTDOWN_PULSE_DURATION_S = 0.15   # Duration of the rumble pulse for "3", "2", "1".
 COUNTDOWN_START_PULSE_DURATION_S = 0.2 # Duration of the rumble pulse for "Start!".
+COUNTDOWN_LEAD_IN_S = 0.5          # Brief pause between "Starting simulation in..." and the first step.
+_COUNTDOWN_LEAD_IN_NS = int(COUNTDOWN_LEAD_IN_S * 1e9)
+# Fully precomputed countdown steps: (text, encoded rumble packet, pulse duration (ns), step interval (ns)).
+# The pulse parameters never change, so each step's 8-byte packet is encoded once here and a pulse is a single HID write.
+# "3", "2", "1" start exactly 1 second apart on a fixed deadline grid; "Start!" is followed only by a short pause (0.2 s from its start).
+_COUNTDOWN_STEPS = tuple(
+    (text,
+     RumbleData(max(41.0, (COUNTDOWN_BASE_FREQ_HZ + i * COUNTDOWN_FREQ_STEP_HZ) * 0.6), # Low freq tied to high freq, kept in valid range
+                COUNTDOWN_BASE_FREQ_HZ + i * COUNTDOWN_FREQ_STEP_HZ,
+                COUNTDOWN_BASE_INTENSITY + i * COUNTDOWN_INTENSITY_STEP).GetData(),
+     int(duration * 1e9),
+     int(interval * 1e9)) # Measured from the step's start, so the pulse time is already included
+    for i, (text, duration, interval) in enumerate((
+        ("3", COUNTDOWN_PULSE_DURATION_S, 1.0),
+        ("2", COUNTDOWN_PULSE_DURATION_S, 1.0),
+        ("1", COUNTDOWN_PULSE_DURATION_S, 1.0),
+        ("Start!", COUNTDOWN_START_PULSE_DURATION_S, 0.2),
+    ))
+)
 
 # -- Timing --
 LOOP_SLEEP_TIME = 0.05 # Target time interval (in seconds) for each iteration of the main simulation loop (approx 20 Hz update rate). Affects responsiveness and decay calculations.
+_LOOP_PERIOD_NS = int(LOOP_SLEEP_TIME * 1e9) # Loop interval in integer nanoseconds, the spacing of the loop's fixed-rate frame schedule.
 SIMULATION_DURATION_S = 10.0 # Total duration (in seconds) the main simulation loop will run for energy accumulation and final strength assessment.
+_NS_TO_S = 1e-9 # Converts integer nanosecond deltas (time.perf_counter_ns()) to seconds.
+SLEEP_SPIN_MARGIN_S = 0.0015 # Final stretch of each loop sleep that is busy-waited instead of slept (non-Linux only, see precise_sleep).
+_PRECISE_SLEEP_SPIN = not sys.platform.startswith("linux") # Linux's high-resolution timers make a plain sleep accurate enough.
+TIMER_RESOLUTION_MS = 1 # System timer resolution requested on Windows while the script runs (the default ~15.6 ms coarsens every sleep).
+STATUS_RATE_HZ = 10 # How often the console status line is redrawn (the simulation itself runs at the full loop rate).
+_STATUS_EVERY_N_FRAMES = max(1, round(1.0 / (STATUS_RATE_HZ * LOOP_SLEEP_TIME))) # Frames between status line redraws.
+STATUS_FLUSH_EVERY = 5 # When stdout is redirected (not a terminal), flush only every Nth status line.
+# Status line layout, filled with %-formatting (one C-level format call per redraw).
+# Shows remaining time, current/average gyro, energy + bar, rumble intensity and classification.
+_STATUS_LINE_FORMAT = ("\rTime Left: %4.1fs | Gyro Now:%7.1f Avg:%7.1f | "
+                       "Energy:%7.1f %s | "
+                       "Rumble:%4.2f | %s        ")
+SENSOR_TRACEBACK_EVERY = 50 # For unexpected sensor read errors, print the full traceback only for the first and every Nth one after.
+WORKER_ERROR_EVERY = 50 # For background writer failures (e.g. a disconnected Joy-Con at 20 Hz), print only the first and every Nth one after.
+BUTTON_POLL_INTERVAL_S = 0.008 # Button polling period while waiting for the start press; about half the Joy-Con's ~15 ms input report period, so a new report is seen within ~8 ms.
+_BUTTON_POLL_PERIOD_NS = int(BUTTON_POLL_INTERVAL_S * 1e9)
 
 # -- Energy Bar Settings --
 ENERGY_HISTORY_DURATION_S = 10.0 # How many seconds of recent gyroscope data to consider for the rolling average calculation.
-ENERGY_SMOOTHING_FACTOR = 0.15   # Exponential Moving Average (EMA) like factor (alpha). Smaller values result in smoother but slower energy level changes. Range (0, 1).
+ENERGY_SMOOTHING_FACTOR = 0.15   # Exponential Moving Average (EMA) factor (alpha) per LOOP_SLEEP_TIME step; rescaled to the actual time step. Smaller values result in smoother but slower energy level changes. Range (0, 1).
+ENERGY_AVERAGE_REFRESH_S = 0.05  # How often (seconds) the rolling average is recomputed; it moves slowly, and the energy integrator's time constant is far longer.
+_ENERGY_AVERAGE_REFRESH_NS = int(ENERGY_AVERAGE_REFRESH_S * 1e9)
 ENERGY_DECAY_RATE = 0.6          # Rate (as a fraction per second) at which the energy level decays towards the rolling average when the energy level is currently higher than the average. Prevents energy staying high after motion stops.
+_LN_ONE_MINUS_SMOOTHING = math.log1p(-ENERGY_SMOOTHING_FACTOR) # ln(1 - alpha), used to rescale the smoothing factor to the actual time step.
+# Smoothing/decay factors for the usual step of exactly one frame (the loop runs on a fixed-rate schedule).
+_FRAME_ALPHA = -math.expm1(_LN_ONE_MINUS_SMOOTHING)
+_FRAME_DECAY = math.exp(-ENERGY_DECAY_RATE * LOOP_SLEEP_TIME)
+_GYRO_HISTORY_MAXLEN = int(ENERGY_HISTORY_DURATION_S / LOOP_SLEEP_TIME) + 8 # Samples per history window at the loop rate, plus slack for jitter.
+_ENERGY_HISTORY_NS = int(ENERGY_HISTORY_DURATION_S * 1e9) # History window in integer nanoseconds (timestamps come from time.perf_counter_ns()).
 
 # -- Typhoon Classification Thresholds --
 # Scales wind speeds (km/h) to gyroscope magnitude values.
@@ -59,40 +120,130 @@ _SORTED_THRESHOLDS = sorted(TYPHOON_THRESHOLDS.items(), key=lambda item: item[1]
 # --- Create Level Mapping (After sorting thresholds) ---
 # Assigns a numerical level to each classification name.
 _NUM_TYPHOON_LEVELS = len(_SORTED_THRESHOLDS) + 1 # Total number of levels (including Calm at level 0).
-_NAME_TO_LEVEL_MAP = {name: i + 1 for i, (name, _) in enumerate(_SORTED_THRESHOLDS)} # Levels 1 to N for storm categories.
-_NAME_TO_LEVEL_MAP["無風 (Calm)"] = 0 # Assign level 0 specifically to Calm.
+_THRESHOLD_VALUES = tuple(value for _, value in _SORTED_THRESHOLDS) # Sorted magnitudes, searched with bisect.
+# Pre-formatted "Level X/N: Name" strings, parallel to _THRESHOLD_VALUES (levels 1 to N for storm categories).
+_LEVEL_STRINGS = tuple(f"Level {i + 1}/{_NUM_TYPHOON_LEVELS - 1}: {name}" for i, (name, _) in enumerate(_SORTED_THRESHOLDS))
+_CALM_LEVEL_STRING = f"Level 0/{_NUM_TYPHOON_LEVELS - 1}: 無風 (Calm)" # Level 0 is reserved for Calm.
+
+# -- Energy Bar Display --
+ENERGY_BAR_WIDTH = 30 # Character width of the energy bar in the status line (excluding brackets).
+# Every possible bar at ENERGY_BAR_WIDTH, pre-built and indexed by the number of filled cells.
+_ENERGY_BAR_STRINGS = tuple(f"[{'#' * i}{'-' * (ENERGY_BAR_WIDTH - i)}]" for i in range(ENERGY_BAR_WIDTH + 1))
 
 # --- End Constants ---
 
 class Debug:
-    """Simple utility class for conditional debug/info/error printing."""
+    """
+    Simple utility class for conditional debug/info/error printing.
+    Messages may take %-style arguments (Debug.error("Failed: %s", e)), which are only
+    formatted when debug output is enabled; hot-path callers use this form so a
+    disabled Debug costs no string building.
+    """
     ENABLED = True # Set to False to disable debug messages
     @staticmethod
-    def log(message: str):
-        if Debug.ENABLED: print(f"[DEBUG] {message}")
+    def log(message: str, *args):
+        if Debug.ENABLED: print("[DEBUG] " + (message % args if args else message))
     @staticmethod
-    def error(message: str):
+    def error(message: str, *args):
         # Always print errors to stderr if enabled
-        if Debug.ENABLED: print(f"[ERROR] {message}", file=sys.stderr)
+        if Debug.ENABLED: print("[ERROR] " + (message % args if args else message), file=sys.stderr)
     @staticmethod
-    def info(message: str):
-        if Debug.ENABLED: print(f"[INFO] {message}")
+    def info(message: str, *args):
+        if Debug.ENABLED: print("[INFO] " + (message % args if args else message))
+
+def _clamp01(value: float) -> float:
+    """Clamps value to [0.0, 1.0] (specialized clamp for intensities and fill ratios)."""
+    return 0.0 if value < 0.0 else 1.0 if value > 1.0 else value
+
+# Windows multimedia timer API (None on other platforms, whose sleeps are already fine-grained)
+_winmm = ctypes.WinDLL("winmm") if sys.platform == "win32" else None
+_timer_resolution_raised = False # Whether timeBeginPeriod is currently in effect (so timeEndPeriod is only called to match it)
+
+def raise_timer_resolution():
+    """
+    On Windows, requests TIMER_RESOLUTION_MS system timer resolution, so the OS sleep in
+    precise_sleep (and every other sleep) wakes within ~1 ms instead of a ~15.6 ms quantum
+    and the busy-wait tail stays short. No-op on other platforms.
+    """
+    global _timer_resolution_raised
+    if _winmm is None or _timer_resolution_raised: return
+    try:
+        _timer_resolution_raised = _winmm.timeBeginPeriod(TIMER_RESOLUTION_MS) == 0 # 0 is TIMERR_NOERROR
+    except Exception as e:
+        Debug.error("Failed to raise timer resolution: %s", e)
+
+def restore_timer_resolution():
+    """Undoes raise_timer_resolution (safe to call if it was never raised)."""
+    global _timer_resolution_raised
+    if not _timer_resolution_raised: return
+    try:
+        _winmm.timeEndPeriod(TIMER_RESOLUTION_MS)
+    except Exception as e:
+        Debug.error("Failed to restore timer resolution: %s", e)
+    _timer_resolution_raised = False
+
+def precise_sleep(deadline_ns: int):
+    """
+    Sleeps until the given time.perf_counter_ns() deadline.
+    OS sleeps can overshoot by several milliseconds on Windows/macOS, so there the
+    last SLEEP_SPIN_MARGIN_S is busy-waited on the clock instead.
+    On Linux a plain sleep is already accurate, so no CPU is spent spinning.
+    """
+    perf_counter_ns = time.perf_counter_ns
+    remaining_ns = deadline_ns - perf_counter_ns()
+    if remaining_ns <= 0: return # Already past the deadline
+    if not _PRECISE_SLEEP_SPIN:
+        time.sleep(remaining_ns * _NS_TO_S)
+        return
+    coarse_s = remaining_ns * _NS_TO_S - SLEEP_SPIN_MARGIN_S
+    if coarse_s > 0: time.sleep(coarse_s) # Sleep most of the way...
+    while perf_counter_ns() < deadline_ns: pass # ...then spin to the exact deadline
+
+def wait_for_next_frame(loop_start_ns: int, frame_idx: int) -> int:
+    """
+    Fixed-rate scheduler step: waits for the start of the frame after `frame_idx`
+    (frames start every LOOP_SLEEP_TIME from `loop_start_ns`) and returns its index.
+    If the loop has overrun by more than a whole frame, the frames that can no
+    longer be met are dropped (the returned index jumps ahead) rather than being
+    run back-to-back to catch up.
+    """
+    next_idx = frame_idx + 1
+    late_ns = time.perf_counter_ns() - (loop_start_ns + next_idx * _LOOP_PERIOD_NS)
+    if late_ns > _LOOP_PERIOD_NS:
+        next_idx += late_ns // _LOOP_PERIOD_NS # Skip the frames that are already over
+    precise_sleep(loop_start_ns + next_idx * _LOOP_PERIOD_NS)
+    return next_idx
 
 # --- Type Definitions ---
-# Using TypedDict for better code structure and readability when passing complex data.
-class SensorData(TypedDict):
-    """Structure to hold raw sensor readings and calculated magnitudes."""
+# Using NamedTuple/slotted classes for better code structure and readability when passing complex data.
+class SensorData(NamedTuple):
+    """
+    Structure to hold raw sensor readings and calculated magnitudes.
+    A NamedTuple (not a dict) since one is built per sensor read: cheaper to
+    allocate, and fields are read by attribute (offset) instead of key hashing.
+    """
     ax: float; ay: float; az: float
     gx: float; gy: float; gz: float
-    accel_mag: float
-    gyro_mag: float
+    gyro_mag_sq: float  # Squared magnitude: sqrt is deferred to where the real magnitude is needed.
 
-class LingerState(TypedDict):
-    """Structure to hold the state variables for the rumble linger effect."""
-    active: bool             # Is a linger effect currently happening?
-    peak_intensity: float    # The rumble intensity that triggered the current linger.
-    initial_duration: float  # The total duration calculated for this specific linger (based on peak_intensity).
-    time_remaining: float    # How much time (in seconds) is left for the current linger effect.
+class GyroHistory:
+    """
+    Time-windowed gyroscope magnitude history with a running total, so the average is O(1).
+    Stored as a preallocated ring buffer: two parallel arrays (timestamps and magnitudes)
+    indexed modulo their length, so recording a reading is two slot writes with no
+    allocation, and the oldest reading is found at the tail index.
+    """
+    __slots__ = ("timestamps", "magnitudes", "head", "tail", "count", "running_sum")
+
+    def __init__(self):
+        # Sized to roughly one window of samples at the loop rate; when full, the
+        # oldest reading is overwritten, so the timestamp trim rarely runs.
+        self.timestamps = array('q', bytes(8 * _GYRO_HISTORY_MAXLEN)) # Reading timestamps (ns)
+        self.magnitudes = array('d', bytes(8 * _GYRO_HISTORY_MAXLEN)) # Gyro magnitudes, parallel to timestamps
+        self.head: int = 0              # Slot the next reading is written to
+        self.tail: int = 0              # Slot of the oldest reading still in the history
+        self.count: int = 0             # Number of readings currently in the history
+        self.running_sum: float = 0.0   # Sum of all magnitudes currently in the history
 
 # --- Initialization ---
 def initialize_right_joycon() -> Optional[RumbleJoyCon]:
@@ -108,7 +259,7 @@ def initialize_right_joycon() -> Optional[RumbleJoyCon]:
         if not joycon_id_right:
             Debug.error("Right Joy-Con not found. Ensure it's paired and connected via Bluetooth.")
             return None
-        Debug.info(f"Found Right Joy-Con: vendor_id={joycon_id_right[0]}, product_id={joycon_id_right[1]}, serial={joycon_id_right[2]}")
+        Debug.info("Found Right Joy-Con: vendor_id=%s, product_id=%s, serial=%s", joycon_id_right[0], joycon_id_right[1], joycon_id_right[2])
 
         # Create the RumbleJoyCon instance
         joycon_right = RumbleJoyCon(*joycon_id_right)
@@ -120,31 +271,32 @@ def initialize_right_joycon() -> Optional[RumbleJoyCon]:
             Debug.info("Vibration enabled.")
         except Exception as vib_e:
             # Log error but attempt to continue; rumble might fail later
-            Debug.error(f"Failed to explicitly enable vibration during init: {vib_e}")
+            Debug.error("Failed to explicitly enable vibration during init: %s", vib_e)
 
         Debug.info("Right Joy-Con initialized.")
         time.sleep(0.5)  # Allow time for connection to stabilize before use
         return joycon_right
     except Exception as e:
-        Debug.error(f"Error initializing Right Joy-Con: {e}")
-        import traceback; traceback.print_exc() # Print full traceback for debugging
+        Debug.error("Error initializing Right Joy-Con: %s", e)
+        traceback.print_exc() # Print full traceback for debugging
         return None
 
 # --- Button Mapping ---
-# Maps descriptive button names to lambda functions that call the corresponding
-# JoyCon getter method. Lambdas prevent immediate method calls.
-BUTTON_METHOD_MAP_RIGHT: Dict[str, Callable[[RumbleJoyCon], bool]] = {
-    "A": lambda jc: jc.get_button_a(),
-    "B": lambda jc: jc.get_button_b(),
-    "X": lambda jc: jc.get_button_x(),
-    "Y": lambda jc: jc.get_button_y(),
-    "R": lambda jc: jc.get_button_r(),       # Shoulder button
-    "ZR": lambda jc: jc.get_button_zr(),      # Trigger button
-    "PLUS": lambda jc: jc.get_button_plus(),  # '+' button
-    "HOME": lambda jc: jc.get_button_home(),  # Home button
-    "R_STICK": lambda jc: jc.get_button_r_stick(), # Press down on right stick
-    "SL": lambda jc: jc.get_button_right_sl(), # Small side button (when detached)
-    "SR": lambda jc: jc.get_button_right_sr(), # Small side button (when detached)
+# Maps descriptive button names to the names of the corresponding JoyCon getter
+# methods. Pollers bind the getter once with getattr and then call the bound method
+# directly, so each poll is a plain call with no per-poll attribute lookup.
+BUTTON_METHOD_MAP_RIGHT: Dict[str, str] = {
+    "A": "get_button_a",
+    "B": "get_button_b",
+    "X": "get_button_x",
+    "Y": "get_button_y",
+    "R": "get_button_r",       # Shoulder button
+    "ZR": "get_button_zr",      # Trigger button
+    "PLUS": "get_button_plus",  # '+' button
+    "HOME": "get_button_home",  # Home button
+    "R_STICK": "get_button_r_stick", # Press down on right stick
+    "SL": "get_button_right_sl", # Small side button (when detached)
+    "SR": "get_button_right_sr", # Small side button (when detached)
 }
 
 # --- Button Detection Function ---
@@ -166,33 +318,38 @@ def wait_for_button_press(joycon: RumbleJoyCon, target_button: str) -> bool:
         Debug.error("Invalid JoyCon object passed to wait_for_button_press.")
         return False
     if target_button not in BUTTON_METHOD_MAP_RIGHT:
-        Debug.error(f"Target button '{target_button}' not defined in BUTTON_METHOD_MAP_RIGHT.")
+        Debug.error("Target button '%s' not defined in BUTTON_METHOD_MAP_RIGHT.", target_button)
         return False
 
     print(f"\n--- Waiting for '{target_button}' press (Press Ctrl+C to cancel) ---")
     print(f"Press the '{target_button}' button on the right Joy-Con to start the simulation...")
 
-    # Stores the state of each button from the *previous* loop iteration
-    previous_button_states: Dict[str, bool] = {name: False for name in BUTTON_METHOD_MAP_RIGHT}
-    target_getter = BUTTON_METHOD_MAP_RIGHT[target_button] # Get the specific method for the target button
+    # State of the target button from the *previous* loop iteration (only the target is ever polled)
+    prev_pressed = False
+    try:
+        target_getter = getattr(joycon, BUTTON_METHOD_MAP_RIGHT[target_button]) # Bind the target button's getter once
+    except AttributeError:
+        Debug.error("Joy-Con has no '%s' method.", BUTTON_METHOD_MAP_RIGHT[target_button])
+        return False
+    sleep = time.sleep # Bind once for the polling loop
+    perf_counter_ns = time.perf_counter_ns
+    next_poll_ns = perf_counter_ns() # Polls run on a fixed BUTTON_POLL_INTERVAL_S grid from here
 
     try:
         # Loop indefinitely until the target button is pressed or interrupted
         while True:
             try:
                 # Check the target button's current state
-                is_pressed_now = target_getter(joycon)
+                is_pressed_now = target_getter()
 
                 # Detect press: Currently pressed AND wasn't pressed previously
-                if is_pressed_now and not previous_button_states.get(target_button, False):
+                if is_pressed_now and not prev_pressed:
                     print(f"\n[BUTTON PRESS] {target_button} detected!")
-                    # Update state immediately to prevent re-triggering if loop is very fast
-                    previous_button_states[target_button] = True
                     return True # Signal success and exit
 
                 # Update the previous state for the target button for the next iteration
                 # Handles both release and continued holding (prevents re-trigger)
-                previous_button_states[target_button] = is_pressed_now
+                prev_pressed = is_pressed_now
 
             except AttributeError:
                 # Likely Joy-Con disconnected or not fully initialized
@@ -201,12 +358,20 @@ def wait_for_button_press(joycon: RumbleJoyCon, target_button: str) -> bool:
                 return False # Signal failure
             except Exception as e:
                 # Catch other potential errors during button reading
-                Debug.error(f"\nUnexpected error reading button state: {e}")
+                Debug.error("\nUnexpected error reading button state: %s", e)
                 time.sleep(0.5) # Pause before retrying
                 continue # Continue the loop
 
-            # Short sleep to prevent high CPU usage while polling
-            time.sleep(0.03)
+            # Wait for the next poll slot. pyjoycon's reader thread always holds the latest
+            # input report, so each poll only reads that one report; polling at about twice
+            # the report rate bounds press-to-detection delay to ~8 ms, since the polls
+            # aren't phase-locked to report arrival, while still sleeping between polls.
+            next_poll_ns += _BUTTON_POLL_PERIOD_NS
+            remaining_ns = next_poll_ns - perf_counter_ns()
+            if remaining_ns > 0:
+                sleep(remaining_ns * _NS_TO_S)
+            else:
+                next_poll_ns -= remaining_ns # Fell behind (e.g. after an error pause): resync to now instead of polling in a burst
 
     except KeyboardInterrupt:
         # User pressed Ctrl+C
@@ -217,44 +382,34 @@ def wait_for_button_press(joycon: RumbleJoyCon, target_button: str) -> bool:
         print("--- Button waiting finished. ---")
 
 # --- Rumble Pulse Function ---
-def rumble_pulse(joycon: RumbleJoyCon, low_freq: float, high_freq: float, intensity: float, duration: float):
+def send_rumble_pulse(send_rumble: Callable[[bytes], None], stop_rumble: Callable[[], None],
+                      rumble_bytes: bytes, stop_deadline_ns: int):
     """
-    Sends a single, short rumble pulse with specified parameters and then stops the rumble.
-    Used for distinct feedback like the countdown.
+    Sends an already encoded rumble packet, holds it until the given time.perf_counter_ns()
+    deadline and then stops the rumble. Taking an absolute deadline (instead of a duration)
+    keeps the stop edge from drifting by the time the HID write itself took.
 
     Args:
-        joycon: The initialized RumbleJoyCon object.
-        low_freq: Low frequency component (Hz).
-        high_freq: High frequency component (Hz).
-        intensity: Rumble intensity (0.0 to 1.0).
-        duration: Duration of the pulse (in seconds).
+        send_rumble: The Joy-Con's bound _send_rumble method (bound once by the caller).
+        stop_rumble: The Joy-Con's bound rumble_stop method (bound once by the caller).
+        rumble_bytes: The encoded 8-byte rumble packet.
+        stop_deadline_ns: time.perf_counter_ns() timestamp at which the pulse ends.
     """
-    if not joycon: return # Don't proceed if joycon is invalid
     try:
-        # Clamp input values to safe/valid ranges for the rumble hardware/API
-        low_freq = clamp(low_freq, 41, 626)
-        high_freq = clamp(high_freq, 82, 1253)
-        intensity = clamp(intensity, 0.0, 1.0)
-        duration = max(0.01, duration) # Ensure a minimal duration to prevent issues
-
-        # Generate the rumble data packet
-        rumble_data_gen = RumbleData(low_freq, high_freq, intensity)
-        rumble_bytes = rumble_data_gen.GetData()
-
         # Send the rumble command
-        joycon._send_rumble(rumble_bytes)
+        send_rumble(rumble_bytes)
 
-        # Wait for the specified pulse duration
-        time.sleep(duration)
+        # Hold the pulse until its stop deadline
+        precise_sleep(stop_deadline_ns)
 
         # Explicitly stop the rumble after the pulse
-        joycon.rumble_stop()
+        stop_rumble()
 
     except Exception as e:
-        Debug.error(f"Error during rumble pulse: {e}")
+        Debug.error("Error during rumble pulse: %s", e)
         # Attempt to stop rumble even if an error occurred during the pulse
         try:
-            if joycon: joycon.rumble_stop()
+            stop_rumble()
         except: pass # Ignore errors during emergency stop
 
 # --- Countdown Function ---
@@ -268,141 +423,200 @@ def perform_countdown_with_rumble(joycon: RumbleJoyCon):
         return
 
     print("\nStarting simulation in...")
-    time.sleep(0.5) # Initial brief pause before countdown starts
-
-    # Define parameters for each step of the countdown (text, high freq, intensity, duration)
-    countdown_steps = [
-        ("3", COUNTDOWN_BASE_FREQ_HZ + 0 * COUNTDOWN_FREQ_STEP_HZ, COUNTDOWN_BASE_INTENSITY + 0 * COUNTDOWN_INTENSITY_STEP, COUNTDOWN_PULSE_DURATION_S),
-        ("2", COUNTDOWN_BASE_FREQ_HZ + 1 * COUNTDOWN_FREQ_STEP_HZ, COUNTDOWN_BASE_INTENSITY + 1 * COUNTDOWN_INTENSITY_STEP, COUNTDOWN_PULSE_DURATION_S),
-        ("1", COUNTDOWN_BASE_FREQ_HZ + 2 * COUNTDOWN_FREQ_STEP_HZ, COUNTDOWN_BASE_INTENSITY + 2 * COUNTDOWN_INTENSITY_STEP, COUNTDOWN_PULSE_DURATION_S),
-    ]
-    # Define the "Start!" step separately (potentially different duration/intensity)
-    start_step = ("Start!", COUNTDOWN_BASE_FREQ_HZ + 3 * COUNTDOWN_FREQ_STEP_HZ, COUNTDOWN_BASE_INTENSITY + 3 * COUNTDOWN_INTENSITY_STEP, COUNTDOWN_START_PULSE_DURATION_S)
-
-    # Execute the "3", "2", "1" steps
-    for text, hf, intensity, duration in countdown_steps:
-        # Calculate a suitable low frequency (e.g., related to high freq, but clamped)
-        lf = max(41.0, hf * 0.6) # Ensure low freq is within valid range
-        # Send the rumble pulse for this step
-        rumble_pulse(joycon, lf, hf, intensity, duration)
-        # Print the countdown number immediately after the pulse starts
-        print(text, flush=True) # flush=True ensures it appears without waiting for newline
-        # Pause between steps, accounting for the time the rumble pulse already took
-        # Aims for roughly a 1-second interval between the *start* of each step's print/rumble
-        time.sleep(max(0.0, 1.0 - duration))
 
-    # Execute the final "Start!" step
-    lf_start = max(41.0, start_step[1] * 0.6) # Calculate low frequency for "Start!"
-    rumble_pulse(joycon, lf_start, start_step[1], start_step[2], start_step[3])
-    print(start_step[0], flush=True)
-    # Short pause after "Start!" before the main simulation loop begins
-    time.sleep(max(0.0, 0.2 - start_step[3]))
+    # Bind the send/stop methods once for the whole countdown
+    send_rumble = joycon._send_rumble
+    stop_rumble = joycon.rumble_stop
+
+    # Every pulse edge is scheduled on an absolute deadline grid, so HID write
+    # latency and print time never accumulate into the step spacing
+    step_start_ns = time.perf_counter_ns() + _COUNTDOWN_LEAD_IN_NS
+    precise_sleep(step_start_ns) # Initial brief pause before countdown starts
+
+    # Execute the "3", "2", "1" and "Start!" steps (all parameters precomputed in _COUNTDOWN_STEPS)
+    for text, rumble_bytes, duration_ns, interval_ns in _COUNTDOWN_STEPS:
+        # Send the precomputed rumble pulse for this step
+        send_rumble_pulse(send_rumble, stop_rumble, rumble_bytes, step_start_ns + duration_ns)
+        # Print the countdown text immediately after the pulse
+        print(text, flush=True) # flush=True ensures it appears without waiting for newline
+        # Wait for the next step's start (or for the main simulation loop to begin after "Start!")
+        step_start_ns += interval_ns
+        precise_sleep(step_start_ns)
 
 # --- Core Calculation Functions ---
-def read_sensor_data(joycon: RumbleJoyCon) -> Optional[SensorData]:
+# First IMU sample of a standard input report: six little-endian int16s
+# (accel x/y/z, then gyro x/y/z) starting at byte 13, the layout pyjoycon's getters decode.
+_IMU_SAMPLE = struct.Struct("<6h")
+_IMU_REPORT_OFFSET = 13
+# Fixed, non-trivial report (mixed signs in every axis) used to check the raw decoding against the getters
+_IMU_CHECK_REPORT = bytes((i * 37 + 11) & 0xFF for i in range(49))
+# pyjoycon's per-axis calibration attributes, applied by its getters as (raw - offset) * coeff
+_IMU_CALIBRATION_ATTRS = tuple(f"_{sensor}_{kind}_{axis}" for sensor in ("ACCEL", "GYRO")
+                               for kind in ("OFFSET", "COEFF") for axis in "XYZ")
+
+def _make_raw_imu_reader(joycon: RumbleJoyCon) -> Optional[Callable[[], tuple]]:
     """
-    Reads accelerometer and gyroscope data from the Joy-Con.
-    Calculates the vector magnitudes for both sensors.
-
-    Returns:
-        A SensorData dictionary containing raw axes and magnitudes,
-        or None if reading fails or data is incomplete.
+    Returns a function that decodes all six IMU axes (accel x/y/z, gyro x/y/z) from one
+    snapshot of pyjoycon's latest raw input report, or None if that isn't safe to use.
+    This relies on pyjoycon internals (_input_report, the byte layout above and the
+    calibration attributes), so it is only used when those attributes exist and its
+    output matches the public getters on a sample report; otherwise callers fall
+    back to the getters.
     """
     try:
-        # Get raw sensor values
-        accel_x = joycon.get_accel_x(); accel_y = joycon.get_accel_y(); accel_z = joycon.get_accel_z()
-        gyro_x = joycon.get_gyro_x(); gyro_y = joycon.get_gyro_y(); gyro_z = joycon.get_gyro_z()
-
-        # Check if any sensor reading failed (might return None)
-        if None in (accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z):
-             Debug.log("Incomplete sensor data received.")
-             return None
-
-        # Calculate magnitude of acceleration vector (includes gravity)
-        accel_magnitude = math.sqrt(accel_x**2 + accel_y**2 + accel_z**2)
-        # Calculate magnitude of gyroscope vector (angular velocity)
-        gyro_magnitude = math.sqrt(gyro_x**2 + gyro_y**2 + gyro_z**2)
-
-        # Return data packed in a dictionary, ensuring float types
-        return {
-            "ax": float(accel_x), "ay": float(accel_y), "az": float(accel_z),
-            "gx": float(gyro_x), "gy": float(gyro_y), "gz": float(gyro_z),
-            "accel_mag": accel_magnitude,
-            "gyro_mag": gyro_magnitude
-        }
-    except AttributeError as e:
-        # Handle cases where the Joy-Con object might be invalid or methods don't exist
-        if "'NoneType' object has no attribute" in str(e):
-            Debug.log("Sensor methods not available yet (Joy-Con might be None).")
-        else:
-            Debug.error(f"AttributeError reading sensors: {e}")
-        return None
+        # Calibration is set when the Joy-Con is constructed, so it is bound once here
+        accel_off_x = joycon._ACCEL_OFFSET_X; accel_off_y = joycon._ACCEL_OFFSET_Y; accel_off_z = joycon._ACCEL_OFFSET_Z
+        accel_coeff_x = joycon._ACCEL_COEFF_X; accel_coeff_y = joycon._ACCEL_COEFF_Y; accel_coeff_z = joycon._ACCEL_COEFF_Z
+        gyro_off_x = joycon._GYRO_OFFSET_X; gyro_off_y = joycon._GYRO_OFFSET_Y; gyro_off_z = joycon._GYRO_OFFSET_Z
+        gyro_coeff_x = joycon._GYRO_COEFF_X; gyro_coeff_y = joycon._GYRO_COEFF_Y; gyro_coeff_z = joycon._GYRO_COEFF_Z
+        if not isinstance(joycon._input_report, (bytes, bytearray)): return None
+    except AttributeError:
+        return None # Not pyjoycon's layout: use the getters
+    unpack_imu = _IMU_SAMPLE.unpack_from
+
+    def decode(report) -> tuple:
+        ax, ay, az, gx, gy, gz = unpack_imu(report, _IMU_REPORT_OFFSET)
+        return ((ax - accel_off_x) * accel_coeff_x, (ay - accel_off_y) * accel_coeff_y, (az - accel_off_z) * accel_coeff_z,
+                (gx - gyro_off_x) * gyro_coeff_x, (gy - gyro_off_y) * gyro_coeff_y, (gz - gyro_off_z) * gyro_coeff_z)
+
+    # Check against the public getters on a probe instance holding the sample report
+    # (the live object's report is replaced by pyjoycon's reader thread at any time)
+    try:
+        # A bare instance (no __init__, so no HID device or reader thread of its own) carrying only
+        # the calibration and the sample report; a copy of the live object would share its HID
+        # handle and close it when garbage-collected (pyjoycon's __del__ closes the device).
+        probe = type(joycon).__new__(type(joycon))
+        probe._joycon_device = None # Keeps pyjoycon's __del__/_close a no-op for the probe
+        for name in _IMU_CALIBRATION_ATTRS:
+            setattr(probe, name, getattr(joycon, name))
+        probe._input_report = _IMU_CHECK_REPORT
+        expected = (probe.get_accel_x(), probe.get_accel_y(), probe.get_accel_z(),
+                    probe.get_gyro_x(), probe.get_gyro_y(), probe.get_gyro_z())
+        if decode(_IMU_CHECK_REPORT) != expected:
+            Debug.info("Raw IMU decoding doesn't match the Joy-Con getters; using the getters.")
+            return None
     except Exception as e:
-        # Catch any other unexpected errors during sensor reading
-        Debug.error(f"Unexpected error reading sensors: {e}")
-        import traceback; traceback.print_exc()
+        Debug.info("Couldn't verify raw IMU decoding (%s); using the getters.", e)
         return None
 
-def calculate_target_intensity(gyro_magnitude: float) -> float:
-    """
-    Calculates the target rumble intensity (0.0 to 1.0) based solely on the
-    current gyroscope magnitude, using the defined threshold and maximum constants.
-    This represents the intensity desired *right now* due to motion.
-    """
-    # No rumble if below the activation threshold
-    if gyro_magnitude < GYRO_RUMBLE_THRESHOLD:
-        return 0.0
-
-    # Calculate the effective range for scaling intensity
-    active_range_size = MAX_MOTION_GYRO_MAGNITUDE - GYRO_RUMBLE_THRESHOLD
-    # Calculate how far the current magnitude is into this active range
-    value_in_range = gyro_magnitude - GYRO_RUMBLE_THRESHOLD
-
-    # Handle edge case where threshold might be >= max (shouldn't happen with valid constants)
-    if active_range_size <= 0:
-        return 1.0 if gyro_magnitude >= GYRO_RUMBLE_THRESHOLD else 0.0
+    def read_imu() -> tuple:
+        # One snapshot of the latest report (the reader thread replaces it, never mutates it)
+        return decode(joycon._input_report)
+    return read_imu
 
-    # Scale the value within the range linearly to [0.0, 1.0]
-    intensity = value_in_range / active_range_size
-
-    # Clamp the result to ensure it's strictly within [0.0, 1.0]
-    return clamp(intensity, 0.0, 1.0)
-
-def calculate_decaying_intensity(state: LingerState) -> float:
-    """
-    Calculates the current rumble intensity based *only* on the linger state.
-    Assumes linear decay from the peak intensity over the initial duration.
+def _read_sensor_data_init(joycon: RumbleJoyCon) -> Callable[[], Optional[SensorData]]:
     """
-    # No intensity if linger isn't active or duration is invalid
-    if not state["active"] or state["initial_duration"] <= 0:
-        return 0.0
+    Binds everything the per-tick sensor read needs once and returns a reader function,
+    so each read calls through closure locals instead of repeated attribute lookups.
+    The reader gets the accelerometer and gyroscope data from the Joy-Con and
+    calculates the squared gyro magnitude (no sqrt here; callers take the root
+    only where the real magnitude is needed).
+
+    When pyjoycon's latest raw input report can be decoded directly (see
+    _make_raw_imu_reader), all six axes are unpacked from one snapshot of it with a
+    single struct call. Besides replacing six getter calls, this guarantees all axes
+    come from the same report (the reader thread can swap in a new report between two
+    getter calls). Otherwise the six getters are used.
 
-    # Calculate the fraction of time remaining for the linger effect
-    decay_factor = state["time_remaining"] / state["initial_duration"]
-    # Multiply the original peak intensity by the decay factor
-    intensity = state["peak_intensity"] * decay_factor
+    Returns:
+        A function taking no arguments that returns a SensorData tuple containing
+        raw axes and magnitudes, or None if reading fails or data is incomplete.
+    """
+    # These never block on HID: pyjoycon's own daemon thread reads each input report
+    # as it arrives (~15 ms cadence) and replaces joycon._input_report with it.
+    read_imu = _make_raw_imu_reader(joycon)
+    if read_imu is None:
+        # Fall back to the individual getters, bound once
+        get_accel_x = joycon.get_accel_x; get_accel_y = joycon.get_accel_y; get_accel_z = joycon.get_accel_z
+        get_gyro_x = joycon.get_gyro_x; get_gyro_y = joycon.get_gyro_y; get_gyro_z = joycon.get_gyro_z
+
+        def read_imu() -> tuple:
+            return (get_accel_x(), get_accel_y(), get_accel_z(),
+                    get_gyro_x(), get_gyro_y(), get_gyro_z())
+    error_count = 0 # Unexpected read errors so far, used to throttle traceback printing
+
+    def read_sensor_data() -> Optional[SensorData]:
+        nonlocal error_count
+        try:
+            # Get raw sensor values: accel x/y/z then gyro x/y/z
+            imu = read_imu()
+
+            # Check if any sensor reading failed (might return None)
+            if None in imu:
+                 Debug.log("Incomplete sensor data received.")
+                 return None
+
+            accel_x, accel_y, accel_z, gyro_x, gyro_y, gyro_z = imu
+            # Calculate the squared magnitude of the gyroscope vector (angular velocity).
+            # Readings are calibrated as (raw - offset) * coeff, so they may be ints or floats
+            # depending on the calibration coefficients. (Nothing uses the accel magnitude,
+            # so it isn't computed.)
+            gyro_mag_sq = gyro_x * gyro_x + gyro_y * gyro_y + gyro_z * gyro_z
+
+            # Return data packed in a SensorData tuple (raw axes are stored as read, no per-axis conversion)
+            return SensorData(
+                accel_x, accel_y, accel_z,
+                gyro_x, gyro_y, gyro_z,
+                gyro_mag_sq
+            )
+        except AttributeError as e:
+            # Handle cases where the Joy-Con's internal state isn't ready (e.g., no input report yet)
+            if "'NoneType' object has no attribute" in str(e):
+                Debug.log("Sensor data not available yet (Joy-Con might not be ready).")
+            else:
+                Debug.error("AttributeError reading sensors: %s", e)
+            return None
+        except Exception as e:
+            # Catch any other unexpected errors during sensor reading
+            # Only print the (slow) full traceback on the first error and every Nth one after,
+            # so a burst of transient HID errors can't stall the simulation loop
+            if error_count % SENSOR_TRACEBACK_EVERY == 0:
+                Debug.error("Unexpected error reading sensors: %s", e)
+                if Debug.ENABLED: traceback.print_exc()
+            else:
+                Debug.error("Unexpected error reading sensors (x%d): %s", error_count + 1, e)
+            error_count += 1
+            return None
 
-    # Ensure intensity doesn't become negative due to float precision
-    return max(0.0, intensity)
+    return read_sensor_data
 
-def update_linger_state(current_state: LingerState, target_intensity: float, delta_time: float) -> LingerState:
+def step_rumble(active: bool, peak_intensity: float, initial_duration: float, time_remaining: float,
+                gyro_mag: float, delta_time: float) -> Tuple[float, bool, float, float, float]:
     """
-    Updates the rumble linger state based on the current motion (`target_intensity`)
-    and the time elapsed since the last update (`delta_time`).
-    Handles triggering, resetting, and decaying the linger effect.
+    Advances the rumble model by one tick: computes the target intensity from the
+    current motion, updates the linger effect, and picks the final intensity.
+    Fused into one function (instead of separate target/decay/update/final steps)
+    so each tick costs one call. The linger state is passed as plain scalars
+    (kept as locals by the caller), so no state object is built per tick.
 
     Args:
-        current_state: The LingerState dictionary from the previous iteration.
-        target_intensity: The intensity calculated from the current gyroscope motion.
+        active: Is a linger effect currently happening?
+        peak_intensity: The rumble intensity that triggered the current linger.
+        initial_duration: The total duration calculated for this specific linger (based on peak_intensity).
+        time_remaining: How much time (in seconds) is left for the current linger effect.
+        gyro_mag: The gyroscope magnitude from the current reading (computed once per tick by the caller).
         delta_time: Time elapsed since the last update (in seconds).
 
     Returns:
-        A new LingerState dictionary representing the updated state.
+        (final_intensity, active, peak_intensity, initial_duration, time_remaining):
+        the rumble intensity (0.0 to 1.0) to send to the Joy-Con, followed by the updated linger state.
     """
-    new_state = current_state.copy() # Work on a copy to avoid modifying the original dict directly
-
-    # Calculate what the intensity *would be* if the current linger just continued decaying
-    potential_decaying_intensity = calculate_decaying_intensity(current_state)
+    # --- Target Intensity (desired *right now* due to motion) ---
+    if gyro_mag < GYRO_RUMBLE_THRESHOLD:
+        target_intensity = 0.0
+    elif gyro_mag >= MAX_MOTION_GYRO_MAGNITUDE:
+        target_intensity = 1.0
+    else:
+        # Scale how far the magnitude is into the active range linearly to [0.0, 1.0)
+        target_intensity = (gyro_mag - GYRO_RUMBLE_THRESHOLD) * _INV_ACTIVE_RANGE
+
+    # --- Intensity the current linger would have decayed to by now ---
+    # Assumes linear decay from the peak intensity over the initial duration.
+    if active and initial_duration > 0:
+        decaying_intensity = peak_intensity * time_remaining / initial_duration
+        if decaying_intensity < 0.0: decaying_intensity = 0.0 # Guard against float precision
+    else:
+        decaying_intensity = 0.0
 
     # --- Trigger or Reset Linger ---
     # A new linger effect starts (or overrides the current one) if:
@@ -410,85 +624,100 @@ def update_linger_state(current_state: LingerState, target_intensity: float, del
     # 2. This current motion intensity is stronger than (or equal to) what the
     #    previous linger effect would have decayed to by now. This ensures
     #    stronger bursts override weaker, decaying ones.
-    if target_intensity > 0 and target_intensity >= potential_decaying_intensity:
-        new_state["active"] = True # Mark linger as active
-        new_state["peak_intensity"] = target_intensity # Store the intensity that triggered this linger
-        # Calculate the initial duration for *this specific* linger, scaled by its intensity
-        new_state["initial_duration"] = target_intensity * MAX_LINGER_DURATION
-        # Reset the remaining time to the full calculated duration
-        new_state["time_remaining"] = new_state["initial_duration"]
-        # Debug.log(f"Linger Trigger/Reset: Peak={target_intensity:.2f}, InitDur={new_state['initial_duration']:.2f}")
+    if target_intensity > 0 and target_intensity >= decaying_intensity:
+        # The duration of *this specific* linger is scaled by its intensity; a fresh
+        # linger is at full strength, so the final intensity is the target itself.
+        duration = target_intensity * MAX_LINGER_DURATION
+        return target_intensity, True, target_intensity, duration, duration
 
     # --- Decay Existing Linger ---
     # If no new trigger occurred, but a linger was already active, decay it.
-    elif new_state["active"]:
+    if active:
         # Reduce remaining time by the time elapsed since last update
-        new_state["time_remaining"] -= delta_time
-        # Check if the linger duration has run out
-        if new_state["time_remaining"] <= 0:
-            # Linger has ended, reset the state to inactive
-            new_state["active"] = False
-            new_state["time_remaining"] = 0.0
-            new_state["peak_intensity"] = 0.0
-            new_state["initial_duration"] = 0.0
-            # Debug.log("Linger Ended")
-        # else:
-            # Optional: Log remaining time during decay
-            # Debug.log(f"Lingering: Remain={new_state['time_remaining']:.2f}")
+        time_remaining -= delta_time
+        # Linger has ended: back to the inactive state
+        if time_remaining <= 0:
+            return target_intensity, False, 0.0, 0.0, 0.0
+        # Take the higher of the current motion and the decayed linger, so the
+        # rumble stays responsive to new motion even during a fade-out
+        decaying_intensity = peak_intensity * time_remaining / initial_duration
+        final_intensity = target_intensity if target_intensity >= decaying_intensity else decaying_intensity
+        return final_intensity, True, peak_intensity, initial_duration, time_remaining
 
     # If no new trigger and not currently active, the state remains inactive.
-    return new_state # Return the updated state dictionary
-
-def determine_final_intensity(target_intensity: float, decaying_intensity: float) -> float:
-    """
-    Determines the final rumble intensity to be sent to the Joy-Con.
-    It takes the higher value between the intensity demanded by the current
-    motion (`target_intensity`) and the intensity from the decaying linger effect.
-    This ensures the rumble feels responsive to new motion even during a fade-out.
-    """
-    return max(target_intensity, decaying_intensity)
+    return target_intensity, False, 0.0, 0.0, 0.0
 
-def send_rumble_command(joycon: RumbleJoyCon, intensity: float):
+def send_rumble_command(send_rumble: Callable[[bytes], None], intensity: float) -> bool:
     """
     Generates the 8-byte rumble data packet based on the final intensity
     and the configured low/high frequencies, then sends it to the Joy-Con.
+
+    Args:
+        send_rumble: Callable that sends the packet (the Joy-Con's bound _send_rumble method,
+            or RumbleWriter.publish to hand it to the writer thread, whose failures
+            are reported through RumbleWriter.failures instead).
+        intensity: Rumble intensity (0.0 to 1.0).
+
+    Returns:
+        True if the packet was sent (or handed off), False if generating or sending it failed.
     """
     try:
-        # Create the RumbleData object (handles frequency/amplitude encoding)
-        rumble_data_generator = RumbleData(RUMBLE_LOW_FREQ, RUMBLE_HIGH_FREQ, intensity)
-        # Get the encoded byte packet
-        rumble_bytes = rumble_data_generator.GetData()
+        # Get the encoded byte packet (frequencies are fixed, so this is a table lookup;
+        # zero intensity maps to the precomputed "off" packet)
+        rumble_bytes = _encode_main_rumble(intensity)
         # Send the packet via the Joy-Con's internal method
-        joycon._send_rumble(rumble_bytes)
+        send_rumble(rumble_bytes)
+        return True
     except Exception as e:
         # Catch potential errors during data generation or HID communication
-        Debug.error(f"Failed to generate or send rumble command: {e}")
+        Debug.error("Failed to generate or send rumble command: %s", e)
+        return False
 
 # --- Energy Bar & Classification Functions ---
-def update_gyro_history(history: deque, current_time: float, gyro_mag: float):
+def update_gyro_history(history: GyroHistory, current_ns: int, gyro_mag: float):
     """
-    Maintains a time-windowed history of gyroscope magnitudes using a deque.
-    Adds the latest reading and removes readings older than ENERGY_HISTORY_DURATION_S.
+    Maintains a time-windowed history of gyroscope magnitudes in a ring buffer.
+    Adds the latest reading and removes readings older than ENERGY_HISTORY_DURATION_S,
+    keeping the history's running total in step with every insert/eviction.
 
     Args:
-        history: The deque object storing (timestamp, magnitude) tuples.
-        current_time: The timestamp of the current reading (e.g., from time.monotonic()).
+        history: The GyroHistory ring buffer storing timestamps, magnitudes and their running total.
+        current_ns: The timestamp of the current reading in integer nanoseconds (from time.perf_counter_ns()).
         gyro_mag: The gyroscope magnitude from the current reading.
     """
-    # Add the new reading (timestamp, value) to the right end of the deque
-    history.append((current_time, gyro_mag))
-    # Remove old entries from the left end until the oldest entry is within the history duration
-    while history and (current_time - history[0][0] > ENERGY_HISTORY_DURATION_S):
-        history.popleft() # popleft() is efficient for deques
-
-def calculate_average_gyro(history: deque) -> float:
-    """Calculates the simple moving average of gyroscope magnitudes in the history deque."""
-    if not history: # Handle empty history (e.g., at the very beginning)
+    timestamps = history.timestamps; magnitudes = history.magnitudes
+    head = history.head; tail = history.tail; count = history.count; running_sum = history.running_sum
+    # A full buffer overwrites its oldest entry; take it out of the running total first
+    if count == _GYRO_HISTORY_MAXLEN:
+        running_sum -= magnitudes[tail]
+        tail += 1
+        if tail == _GYRO_HISTORY_MAXLEN: tail = 0
+        count -= 1
+    # Write the new reading into the head slot of both arrays
+    timestamps[head] = current_ns
+    magnitudes[head] = gyro_mag
+    running_sum += gyro_mag
+    count += 1
+    head += 1
+    if head == _GYRO_HISTORY_MAXLEN: head = 0
+    # Steady state: the oldest entry is still within the window, so there's nothing to trim.
+    # Only trim by timestamp when loop stalls/jitter have pushed entries out of the window.
+    # Timestamps are integer nanoseconds, so these comparisons are exact int math.
+    # (The reading just written is always within the window, so the loop stops at it.)
+    while current_ns - timestamps[tail] > _ENERGY_HISTORY_NS:
+        running_sum -= magnitudes[tail]
+        tail += 1
+        if tail == _GYRO_HISTORY_MAXLEN: tail = 0
+        count -= 1
+    history.head = head; history.tail = tail; history.count = count; history.running_sum = running_sum
+
+def calculate_average_gyro(history: GyroHistory) -> float:
+    """Returns the simple moving average of gyroscope magnitudes in O(1) from the running total."""
+    count = history.count
+    if not count: # Handle empty history (e.g., at the very beginning)
         return 0.0
-    # Sum all magnitude values in the history
-    total_mag = sum(mag for ts, mag in history)
-    # Divide by the number of entries to get the average
-    return total_mag / len(history)
+    # Divide the running total by the number of entries to get the average
+    return history.running_sum / count
 
 def update_energy_level(current_energy: float, target_gyro_mag: float, average_gyro: float, delta_time: float) -> float:
     """
@@ -505,25 +734,27 @@ def update_energy_level(current_energy: float, target_gyro_mag: float, average_g
     Returns:
         The calculated energy level for the current iteration, clamped to valid range.
     """
-    # 1. Smooth towards the current target gyro magnitude (Exponential Moving Average -like)
-    # The energy level moves a fraction (ENERGY_SMOOTHING_FACTOR) of the way
-    # from its current value towards the target value in each step.
-    next_energy = (ENERGY_SMOOTHING_FACTOR * target_gyro_mag) + \
-                  ((1.0 - ENERGY_SMOOTHING_FACTOR) * current_energy)
+    # 1. Smooth towards the current target gyro magnitude (Exponential Moving Average)
+    # ENERGY_SMOOTHING_FACTOR is the fraction moved per LOOP_SLEEP_TIME step. Scale it
+    # to the actual elapsed time so the response doesn't depend on the loop rate:
+    # alpha_eff = 1 - (1 - alpha)^(dt / dt_ref), computed via expm1 for precision.
+    # The fixed-rate loop almost always steps exactly one frame, so use the precomputed factors then.
+    one_frame = delta_time == LOOP_SLEEP_TIME
+    alpha_eff = _FRAME_ALPHA if one_frame else -math.expm1(_LN_ONE_MINUS_SMOOTHING * delta_time / LOOP_SLEEP_TIME)
+    next_energy = (alpha_eff * target_gyro_mag) + ((1.0 - alpha_eff) * current_energy)
 
     # 2. Apply Decay Rule: If the smoothed energy is higher than the recent average,
-    #    make it decay towards that average to simulate energy dissipation.
+    #    make it decay exponentially towards that average (continuous-time) to simulate
+    #    energy dissipation. An exponential approach can never undershoot the average.
     if next_energy > average_gyro:
-        # Calculate how much energy to dissipate this step
-        decay_amount = (next_energy - average_gyro) * ENERGY_DECAY_RATE * delta_time
-        # Subtract the decay amount
-        next_energy -= decay_amount
-        # Ensure the decay doesn't pull the energy *below* the average in a single step
-        next_energy = max(next_energy, average_gyro)
+        decay = _FRAME_DECAY if one_frame else math.exp(-ENERGY_DECAY_RATE * delta_time)
+        next_energy = average_gyro + (next_energy - average_gyro) * decay
 
     # 3. Clamp the final energy level to the valid range [0, MAX_MOTION_GYRO_MAGNITUDE]
-    # This prevents energy from exceeding the defined maximum scale.
-    return clamp(next_energy, 0.0, MAX_MOTION_GYRO_MAGNITUDE)
+    # This prevents energy from exceeding the defined maximum scale. (inlined clamp)
+    if next_energy > MAX_MOTION_GYRO_MAGNITUDE: return float(MAX_MOTION_GYRO_MAGNITUDE)
+    if next_energy < 0.0: return 0.0
+    return next_energy
 
 def get_typhoon_classification(magnitude: float) -> str:
     """
@@ -536,50 +767,190 @@ def get_typhoon_classification(magnitude: float) -> str:
     Returns:
         A formatted string representing the typhoon classification and level.
     """
-    classification_name = "無風 (Calm)" # Default classification
-
-    # Determine the name based on thresholds only if magnitude is positive
-    if magnitude > 0:
-        found_category = False
-        # Iterate through the *sorted* thresholds
-        for name, threshold in _SORTED_THRESHOLDS:
-            # Find the first category whose threshold is >= the magnitude
-            if magnitude <= threshold:
-                classification_name = name
-                found_category = True
-                break
-        # If magnitude exceeds the highest threshold, assign the highest category name
-        if not found_category:
-             classification_name = _SORTED_THRESHOLDS[-1][0]
+    # Non-positive magnitudes are always Calm
+    if magnitude <= 0:
+        return _CALM_LEVEL_STRING
 
-    # Look up the numerical level corresponding to the determined name
-    # Uses the pre-calculated _NAME_TO_LEVEL_MAP for efficiency
-    level = _NAME_TO_LEVEL_MAP.get(classification_name, 0) # Default to level 0 if name somehow isn't found
+    # Binary search the *sorted* thresholds for the first category whose threshold is >= the magnitude
+    index = bisect_left(_THRESHOLD_VALUES, magnitude)
+    # If magnitude exceeds the highest threshold, bisect returns len(); clamp to the highest category
+    if index >= len(_LEVEL_STRINGS):
+        index = len(_LEVEL_STRINGS) - 1
 
-    # Format the final output string (Level X / TotalLevels: Name)
-    # Note: (_NUM_TYPHOON_LEVELS - 1) gives the max storm level number (excluding Calm)
-    return f"Level {level}/{_NUM_TYPHOON_LEVELS - 1}: {classification_name}"
+    # Return the pre-formatted "Level X/TotalLevels: Name" string for that category
+    return _LEVEL_STRINGS[index]
 
-def display_energy_bar(energy: float, max_energy: float, width: int = 30) -> str:
+def display_energy_bar(energy: float, max_energy: float) -> str:
     """
     Generates a simple text-based progress bar string to visualize the energy level.
 
     Args:
         energy: The current energy value.
         max_energy: The maximum possible energy value (used for scaling).
-        width: The desired character width of the bar itself (excluding brackets).
 
     Returns:
         A string representing the energy bar (e.g., "[#########-----------]").
     """
     if max_energy <= 0: return "[ ]" # Handle zero or negative max energy
     # Calculate the fill ratio (0.0 to 1.0)
-    fill_level = clamp(energy / max_energy, 0.0, 1.0)
-    # Calculate how many '#' characters to display
-    filled_width = int(fill_level * width)
-    # Create the bar string
-    bar = "#" * filled_width + "-" * (width - filled_width)
-    return f"[{bar}]" # Return the bar enclosed in brackets
+    fill_level = _clamp01(energy / max_energy)
+    # Calculate how many '#' characters to display; the bar width (ENERGY_BAR_WIDTH) is
+    # fixed, so every possible bar is pre-built: just index the table
+    return _ENERGY_BAR_STRINGS[int(fill_level * ENERGY_BAR_WIDTH)]
+
+def _make_status_writer() -> Callable[[str], None]:
+    """
+    Returns a function that writes (and flushes) one status line to the console.
+    On a POSIX terminal the line goes straight to the file descriptor in a single
+    os.write syscall, bypassing the text stream's lock and buffer. On a Windows
+    console it uses sys.stdout.write + flush, so every redraw shows immediately.
+    When output is redirected (file, pipe) nobody watches the redraws live, so the
+    stream is only flushed every STATUS_FLUSH_EVERY lines.
+    """
+    stdout = sys.stdout
+    try:
+        fd = stdout.fileno() if sys.platform != "win32" and stdout.isatty() else -1
+    except (AttributeError, ValueError, OSError): # e.g. stdout replaced by an in-memory stream
+        fd = -1
+    if fd >= 0:
+        stdout.flush() # Anything still buffered must come out before the raw writes
+        encoding = stdout.encoding or "utf-8"
+        write = os.write
+        def write_status(line: str):
+            data = line.encode(encoding, "replace")
+            # os.write may write only part of the data (e.g. when interrupted); write the rest
+            while data:
+                data = data[write(fd, data):]
+        return write_status
+    write = stdout.write; flush = stdout.flush
+    try:
+        interactive = stdout.isatty()
+    except (AttributeError, ValueError, OSError):
+        interactive = False
+    if interactive:
+        def write_status(line: str):
+            write(line)
+            flush()
+        return write_status
+    unflushed = 0 # Lines written since the last flush
+    def write_status(line: str):
+        nonlocal unflushed
+        write(line)
+        unflushed += 1
+        if unflushed >= STATUS_FLUSH_EVERY:
+            flush()
+            unflushed = 0
+    return write_status
+
+_EMPTY_SLOT = object() # Marks a LatestValueWorker slot with nothing pending (None can be a real value)
+
+class LatestValueWorker:
+    """
+    Hands values to a sink callable on one persistent background daemon thread, so a
+    slow sink (console or HID write) never stalls the loop that produces the values.
+    Only the most recent value is kept: publish() overwrites a single slot, so a slow
+    sink skips stale values instead of building up a queue. The worker takes the value
+    out of the slot and empties it in one step under a lock, so a value published
+    while the previous one is being handled is never lost.
+    """
+    __slots__ = ("_sink", "_name", "_error_message", "_latest", "_lock", "_wake", "_running", "_thread", "failures")
+
+    def __init__(self, sink: Callable[[object], None], name: str, error_message: str):
+        self._sink = sink                    # Called on the worker thread with each value taken from the slot
+        self._name = name                    # Thread name
+        self._error_message = error_message  # %-format reporting a sink exception
+        self._latest = _EMPTY_SLOT           # Most recent value published and not yet taken
+        self._lock = threading.Lock()        # Guards taking-and-emptying the slot
+        self._wake = threading.Event()       # Set when there's a new value (or on stop)
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+        self.failures: int = 0               # Sink calls that raised so far (only the worker thread writes this)
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def publish(self, value):
+        """Hands the latest value to the worker thread (never blocks on the sink)."""
+        with self._lock:
+            self._latest = value
+        self._wake.set()
+
+    def stop(self) -> bool:
+        """
+        Handles any pending value, then stops the worker thread (safe to call more than once).
+        Returns True once the thread has exited, False if it is still stuck in the sink.
+        """
+        self._running = False
+        self._wake.set()
+        thread = self._thread
+        if thread is None: return True
+        thread.join(timeout=1.0)
+        return not thread.is_alive()
+
+    def is_alive(self) -> bool:
+        """True while the worker thread is running (including stuck in the sink after stop())."""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def _run(self):
+        lock = self._lock; wake = self._wake; sink = self._sink
+        while True:
+            if self._running: # Once stopping, don't wait: just drain the slot
+                wake.wait()
+                wake.clear()
+            with lock:
+                value = self._latest
+                self._latest = _EMPTY_SLOT
+            if value is _EMPTY_SLOT:
+                if not self._running: return
+                continue
+            try:
+                sink(value)
+            except Exception as e:
+                # Only report the first failure and every Nth one after, so a sink failing on
+                # every value (e.g. a disconnected Joy-Con) doesn't flood the console
+                if self.failures == 0:
+                    Debug.error(self._error_message, e)
+                elif self.failures % WORKER_ERROR_EVERY == 0:
+                    Debug.error("%s (x%d)", self._error_message % e, self.failures + 1)
+                self.failures += 1
+
+class StatusWriter(LatestValueWorker):
+    """
+    Formats and writes the status line on a background daemon thread, so slow
+    console writes (which can spike to several ms on Windows) never stall the loop.
+    """
+    __slots__ = ()
+
+    def __init__(self):
+        write = _make_status_writer()
+
+        def write_status(status: tuple):
+            time_remaining, gyro_mag, average_gyro, energy, rumble_intensity = status
+            # Display remaining time instead of elapsed time
+            write(_STATUS_LINE_FORMAT % (
+                time_remaining, gyro_mag, average_gyro,
+                energy, display_energy_bar(energy, MAX_MOTION_GYRO_MAGNITUDE),
+                rumble_intensity, get_typhoon_classification(energy)))
+        LatestValueWorker.__init__(self, write_status, "StatusWriter", "Failed to write status line: %s")
+
+    def publish(self, time_remaining: float, gyro_mag: float, average_gyro: float, energy: float, rumble_intensity: float):
+        """Hands the latest status values to the writer thread (never blocks on console I/O)."""
+        LatestValueWorker.publish(self, (time_remaining, gyro_mag, average_gyro, energy, rumble_intensity))
+
+class RumbleWriter(LatestValueWorker):
+    """
+    Performs the main loop's HID rumble writes on one persistent background daemon
+    thread, so a slow or stalled write never delays sensor reads or the frame schedule.
+    A stalled device gets the current rumble once it recovers instead of replaying
+    a backlog of stale packets.
+    """
+    __slots__ = ()
+
+    def __init__(self, send_rumble: Callable[[bytes], None]):
+        LatestValueWorker.__init__(self, send_rumble, "RumbleWriter", "Failed to send rumble command: %s")
 
 # --- Main Simulation Loop ---
 def simulation_loop(joycon: RumbleJoyCon):
@@ -588,6 +959,7 @@ def simulation_loop(joycon: RumbleJoyCon):
     Handles sensor reading, rumble feedback (including linger), energy bar updates,
     classification, status printing, and timing control for a fixed duration.
     """
+    global rumble_writer_right
     if not joycon:
         Debug.error("Invalid JoyCon object passed to simulation_loop.")
         return
@@ -596,26 +968,49 @@ def simulation_loop(joycon: RumbleJoyCon):
     print(f"Sim Duration: {SIMULATION_DURATION_S:.1f}s | Target Max Gyro Mag: {MAX_MOTION_GYRO_MAGNITUDE}")
 
     # Initialize state variables for this simulation run
-    linger_state: LingerState = {"active": False, "peak_intensity": 0.0, "initial_duration": 0.0, "time_remaining": 0.0}
+    # Rumble linger state, kept as plain locals (see step_rumble for what each field means)
+    linger_active = False; linger_peak = 0.0; linger_initial_duration = 0.0; linger_remaining = 0.0
     current_energy: float = 0.0
-    gyro_history: deque[Tuple[float, float]] = deque()  # Stores (timestamp, gyro_mag)
-
-    # Timing variables
-    loop_start_time = time.monotonic() # Record the absolute start time of the loop
-    last_time = loop_start_time        # Timestamp of the previous loop iteration start
+    last_intensity_sent: float = -1.0 # Intensity of the last rumble command sent (-1.0: none yet, so the first tick always sends)
+    last_rumble_sent_ns: int = 0      # Frame timestamp of the last rumble command sent (for the keep-alive)
+    rumble_failures_seen: int = 0     # Writer-thread send failures already accounted for
+    gyro_history = GyroHistory()  # Stores timestamps and gyro_mag values plus their running total
+
+    # Bind the Joy-Con's sensor getters and rumble sender once for the whole run, and set up status output
+    read_sensor_data = _read_sensor_data_init(joycon)
+    rumble_writer = RumbleWriter(joycon._send_rumble) # HID rumble writes happen on this writer's thread
+    rumble_writer_right = rumble_writer # Lets cleanup() see whether this thread is still writing
+    send_rumble = rumble_writer.publish
+    status_writer = StatusWriter()
+    sqrt = math.sqrt # Hot-loop global/attribute lookups bound to locals
+
+    # Timing variables (integer nanoseconds; converted to seconds only for the time-based math).
+    # perf_counter is the highest-resolution clock (monotonic can tick in ~15.6 ms steps on Windows).
+    perf_counter_ns = time.perf_counter_ns
+    # The loop runs on a fixed-rate frame schedule: frame N starts at loop_start_ns + N * LOOP_SLEEP_TIME.
+    loop_start_ns = perf_counter_ns()  # Record the absolute start time of the loop
+    frame_idx = 0                      # Index of the current frame
+    last_frame_idx = -1                # Index of the last frame that was fully processed
+    frames_dropped = 0                 # Frames skipped because the loop overran
+    average_gyro_10s = 0.0             # Latest rolling gyro average
+    last_average_ns = loop_start_ns - _ENERGY_AVERAGE_REFRESH_NS # When it was last refreshed (so the first frame refreshes it)
     final_average_gyro = 0.0           # Variable to store the final result
 
+    rumble_writer.start()
+    status_writer.start()
     try:
         # Main simulation loop
         while True:
-            current_time = time.monotonic() # Get timestamp at the start of this iteration
-            # Calculate time elapsed since the *last iteration* (delta_time)
-            delta_time = max(0.001, current_time - last_time) # Ensure dt is positive
-            last_time = current_time # Update last_time for the next iteration
+            # Scheduled start time of this frame (used as the reading's timestamp)
+            current_ns = loop_start_ns + frame_idx * _LOOP_PERIOD_NS
+            # Time since the last processed frame, as whole frames rather than the measured gap,
+            # so the linger/energy integrators see a constant step and runs are repeatable
+            delta_time = (frame_idx - last_frame_idx) * LOOP_SLEEP_TIME
 
             # --- Check simulation end time ---
-            time_elapsed = current_time - loop_start_time  # Calculate elapsed time first
+            time_elapsed = frame_idx * LOOP_SLEEP_TIME  # Calculate elapsed time first
             if time_elapsed >= SIMULATION_DURATION_S:
+                status_writer.stop() # Let the last status line finish before printing below it
                 print("\n--- Simulation Time Ended ---")
                 final_average_gyro = calculate_average_gyro(gyro_history)
                 break  # Exit the main loop
@@ -625,45 +1020,66 @@ def simulation_loop(joycon: RumbleJoyCon):
             time_remaining = max(0.0, SIMULATION_DURATION_S - time_elapsed)
 
             # --- Sensor Reading ---
-            sensor_data = read_sensor_data(joycon)
-            if sensor_data is None: time.sleep(LOOP_SLEEP_TIME); continue
-            gyro_mag = sensor_data['gyro_mag']
+            sensor_data = read_sensor_data()
+            if sensor_data is None:
+                # Keep to the frame schedule even when a read fails (the next processed frame's
+                # delta_time then covers this one too)
+                next_idx = wait_for_next_frame(loop_start_ns, frame_idx)
+                frames_dropped += next_idx - frame_idx - 1; frame_idx = next_idx
+                continue
+            last_frame_idx = frame_idx
+            gyro_mag_sq = sensor_data.gyro_mag_sq
+            gyro_mag = sqrt(gyro_mag_sq) # Real magnitude, once per tick, for energy and display
 
             # --- Rumble Calculation & Sending ---
-            target_intensity = calculate_target_intensity(gyro_mag)
-            linger_state = update_linger_state(linger_state, target_intensity, delta_time)
-            current_decaying_intensity = calculate_decaying_intensity(linger_state)
-            final_rumble_intensity = determine_final_intensity(target_intensity, current_decaying_intensity)
-            send_rumble_command(joycon, final_rumble_intensity)
+            (final_rumble_intensity, linger_active, linger_peak, linger_initial_duration, linger_remaining
+             ) = step_rumble(linger_active, linger_peak, linger_initial_duration, linger_remaining, gyro_mag, delta_time)
+            # A packet that failed on the writer thread is retried this tick (as with a direct
+            # send), rather than only at the next keep-alive: forget what was "sent".
+            if rumble_writer.failures != rumble_failures_seen:
+                rumble_failures_seen = rumble_writer.failures
+                last_intensity_sent = -1.0
+            # HID writes are the costliest part of a tick: only send when the intensity has
+            # changed noticeably since the last successful send, turns on/off, or the
+            # keep-alive interval has passed.
+            if (abs(final_rumble_intensity - last_intensity_sent) >= RUMBLE_RESEND_EPSILON
+                    or (final_rumble_intensity == 0.0) != (last_intensity_sent == 0.0)
+                    or current_ns - last_rumble_sent_ns >= _RUMBLE_KEEPALIVE_NS):
+                if send_rumble_command(send_rumble, final_rumble_intensity):
+                    last_intensity_sent = final_rumble_intensity
+                    last_rumble_sent_ns = current_ns
 
             # --- Energy Bar Calculation ---
-            update_gyro_history(gyro_history, current_time, gyro_mag)
-            average_gyro_10s = calculate_average_gyro(gyro_history)
+            update_gyro_history(gyro_history, current_ns, gyro_mag)
+            # The rolling average changes slowly, so it is only refreshed every ENERGY_AVERAGE_REFRESH_S
+            # (every frame at the default 20 Hz; less often if the loop rate is raised)
+            if current_ns - last_average_ns >= _ENERGY_AVERAGE_REFRESH_NS:
+                # Inlined calculate_average_gyro: the history is never empty right after an update
+                average_gyro_10s = gyro_history.running_sum / gyro_history.count
+                last_average_ns = current_ns
             current_energy = update_energy_level(current_energy, gyro_mag, average_gyro_10s, delta_time)
-            current_classification_str = get_typhoon_classification(current_energy)
-            energy_bar_str = display_energy_bar(current_energy, MAX_MOTION_GYRO_MAGNITUDE)
 
             # --- Printing Status (Modified Time Display) ---
-            # Display remaining time instead of elapsed time
-            print(
-                f"\rTime Left: {time_remaining: >4.1f}s | Gyro Now:{gyro_mag: >7.1f} Avg:{average_gyro_10s: >7.1f} | "  # <-- MODIFIED LABEL AND VARIABLE
-                f"Energy:{current_energy: >7.1f} {energy_bar_str} | "
-                f"Rumble:{final_rumble_intensity: >4.2f} | {current_classification_str}        ",
-                end="")
-            sys.stdout.flush()
+            # Terminal writes are slow (especially on Windows consoles), so the status line is
+            # only redrawn at STATUS_RATE_HZ, and formatted/written by the status writer thread.
+            if frame_idx % _STATUS_EVERY_N_FRAMES == 0:
+                status_writer.publish(time_remaining, gyro_mag, average_gyro_10s, current_energy, final_rumble_intensity)
 
             # --- Accurate Sleep ---
-            elapsed_this_iter = time.monotonic() - current_time
-            sleep_duration = max(0.0, LOOP_SLEEP_TIME - elapsed_this_iter)
-            time.sleep(sleep_duration)
+            # Wait for the next frame's scheduled start (absolute, so sleep overshoot doesn't
+            # accumulate as drift); overrun frames are dropped and counted.
+            next_idx = wait_for_next_frame(loop_start_ns, frame_idx)
+            frames_dropped += next_idx - frame_idx - 1; frame_idx = next_idx
 
     except KeyboardInterrupt:
         # User pressed Ctrl+C to interrupt the loop
+        status_writer.stop()
         print("\nSimulation interrupted by user.")
         # Calculate the average based on history collected so far
         final_average_gyro = calculate_average_gyro(gyro_history)
     finally:
         # This block executes whether the loop finished normally or was interrupted
+        status_writer.stop() # No-op if already stopped above; otherwise finish the last status line first
 
         # --- Final Output ---
         print("\n--- Final Results ---")
@@ -672,14 +1088,16 @@ def simulation_loop(joycon: RumbleJoyCon):
         # Determine and print the final classification based on the average
         final_classification_str = get_typhoon_classification(final_average_gyro)
         print(f"Final Estimated Strength: {final_classification_str}")
+        if frames_dropped: print(f"Frames dropped (loop overruns): {frames_dropped}")
 
         # --- Stop Rumble ---
         # Ensure rumble is stopped cleanly on exit
-        try:
-            print("Stopping final rumble...")
-            if joycon: joycon.rumble_stop() # Check if joycon object exists
-        except Exception as e:
-            Debug.error(f"Error stopping rumble on exit: {e}")
+        # The stop packet goes through the rumble writer, after any packet still pending there,
+        # so the writer thread is the only one touching the Joy-Con's output report state.
+        print("Stopping final rumble...")
+        rumble_writer.publish(RumbleJoyCon._STOP_PKT)
+        if not rumble_writer.stop():
+            Debug.error("Rumble writer did not finish; the final stop may not have been sent.")
         # Clear the last status line from the console
         print("\r" + " " * 150 + "\r", end="") # Print enough spaces to overwrite typical status line length
 
@@ -688,19 +1106,37 @@ def cleanup():
     global joycon_right
     print("\nExiting script...")
     try:
-        # Check if joycon object exists and has the necessary method before calling
-        if joycon_right and hasattr(joycon_right, 'rumble_stop') and callable(joycon_right.rumble_stop):
-            Debug.info("Ensuring Joy-Con rumble is stopped...")
-            joycon_right.rumble_stop() # Stop any lingering rumble
+        # RumbleJoyCon always provides rumble_stop, so a type check replaces probing for the method
+        if isinstance(joycon_right, RumbleJoyCon):
+            if rumble_writer_right is not None and rumble_writer_right.is_alive():
+                # The writer thread is still stuck in a HID write; a second writer here would race
+                # it on the device and pyjoycon's packet counter, so leave the stop to that thread.
+                Debug.error("Rumble writer is still running; skipping the direct rumble stop.")
+            else:
+                Debug.info("Ensuring Joy-Con rumble is stopped...")
+                joycon_right.rumble_stop() # Stop any lingering rumble
         # Potentially add disconnection logic here if needed
         Debug.info("Cleanup complete.")
     except Exception as e:
-        Debug.error(f"Error during cleanup: {e}")
+        Debug.error("Error during cleanup: %s", e)
+    restore_timer_resolution() # Hand the default timer resolution back to the system
+
+def _exit_on_signal(signum, frame):
+    """
+    Turns a termination signal into a normal interpreter exit. By default SIGTERM kills
+    the process without running finally blocks or atexit handlers, which would leave
+    the Joy-Con rumbling; raising SystemExit runs both, so the rumble is stopped.
+    """
+    sys.exit(128 + signum)
 
 # --- Main Entry Point ---
 if __name__ == "__main__":
     # Register the cleanup function to be called automatically upon script exit
     atexit.register(cleanup)
+    # Ctrl+C already unwinds as KeyboardInterrupt; make SIGTERM (kill, service stop) unwind too
+    signal.signal(signal.SIGTERM, _exit_on_signal)
+    # Fine-grained sleeps for the countdown pulses and the frame schedule (Windows only)
+    raise_timer_resolution()
 
     # Initialize the Joy-Con
     print("Initializing Right Joy-Con...")